@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 import openai
@@ -6,7 +7,14 @@ import boto3
 import boto3.session
 import requests
 from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+import hmac
+import ipaddress
 import random
+import signal
+import threading
+import time
 import tweepy
 
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +29,25 @@ session = boto3.session.Session(region_name="us-east-2")
 # Set SNS topic variable from environment
 SNS_TOPIC = os.environ.get("SNS_TOPIC_ARN", None)
 
+# How long (in seconds) a retrieved SSM parameter is reused before it is fetched again
+PARAM_CACHE_TTL = int(os.environ.get("PARAM_CACHE_TTL", "300"))
+
+# Shared HTTP session so Medium and LinkedIn calls reuse pooled connections
+http_session = requests.Session()
+
+# Profiling settings, a single run can also be profiled with {"profile": true}
+PROFILE_ENABLED = os.environ.get("PROFILE_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "/tmp")
+PROFILE_S3_BUCKET = os.environ.get("PROFILE_S3_BUCKET", None)
+PROFILE_S3_PREFIX = os.environ.get("PROFILE_S3_PREFIX", "profiles/")
+PROFILE_TOP_N = int(os.environ.get("PROFILE_TOP_N", "20"))
+PROFILE_TRACEMALLOC_FRAMES = int(os.environ.get("PROFILE_TRACEMALLOC_FRAMES", "10"))
+
+# Boto3 clients and SSM parameters cached across invocations
+clients = {}
+param_cache = {}
+cache_lock = threading.Lock()
+
 
 # Define a custom HTML parser class that inherits from the built-in HTMLParser
 class MyHTMLParser(HTMLParser):
@@ -54,9 +81,28 @@ class MyHTMLParser(HTMLParser):
             self.title = data
 
 
+def get_client(service_name: str, region_name: str = None):
+    """
+    Function to get a Boto3 client, creating it only on first use.
+
+    Parameters:
+    service_name (str): The name of the AWS service, e.g. "ssm".
+    region_name (str): Optional region for the client.
+
+    Returns:
+    The cached Boto3 client for the service and region.
+    """
+    key = (service_name, region_name)
+    with cache_lock:
+        if key not in clients:
+            logger.debug(f"Creating Boto3 client for {service_name}.")
+            clients[key] = boto3.client(service_name, region_name=region_name)
+        return clients[key]
+
+
 def publish_sns(message: str):
     try:
-        sns_client = session.client("sns")
+        sns_client = get_client("sns", region_name=session.region_name)
 
         if SNS_TOPIC is not None:
             sns_client.publish(
@@ -94,6 +140,7 @@ def get_services():
 def get_param(param_name: str):
     """
     Function to get a parameter value from AWS Systems Manager Parameter Store.
+    Values are cached for PARAM_CACHE_TTL seconds.
 
     Parameters:
     param_name (str): The name of the parameter you want to retrieve.
@@ -103,8 +150,15 @@ def get_param(param_name: str):
     None: If the parameter could not be retrieved.
     """
 
+    # Return the cached value if it has not expired yet
+    with cache_lock:
+        cached = param_cache.get(param_name)
+    if cached is not None and cached[1] > time.monotonic():
+        logger.debug(f"Using cached parameter {param_name}.")
+        return cached[0]
+
     # Initialize the boto3 client for SSM (Simple Systems Manager)
-    client = boto3.client("ssm")
+    client = get_client("ssm")
 
     try:
         # Log the initiation of the parameter retrieval
@@ -120,8 +174,11 @@ def get_param(param_name: str):
         # Return None to indicate that the parameter could not be retrieved
         return None
 
-    # Extract the parameter value from the API response and return it
-    return response["Parameter"]["Value"]
+    # Extract the parameter value from the API response, cache it and return it
+    value = response["Parameter"]["Value"]
+    with cache_lock:
+        param_cache[param_name] = (value, time.monotonic() + PARAM_CACHE_TTL)
+    return value
 
 
 # Function to generate an article using OpenAI's GPT-3 API
@@ -266,7 +323,7 @@ def publish_article(title, content, medium_api_token, medium_user_id):
         logger.info(f"Attempting to publish article with title: {title}")
 
         # Make a POST request to publish the article
-        response = requests.post(url, headers=headers, data=payload)
+        response = http_session.post(url, headers=headers, data=payload)
 
         # Check response status code to determine the outcome
         if response.status_code == 201:
@@ -339,7 +396,7 @@ def share_on_linkedin(article_url, title, linkedin_access_token, post_content):
         logger.info(f"Attempting to share article link {article_url} on LinkedIn.")
 
         # Make a POST request to share the article
-        response = requests.post(url, headers=headers, data=payload)
+        response = http_session.post(url, headers=headers, data=payload)
 
         # Check response status code to determine the outcome
         if response.status_code == 201:
@@ -427,8 +484,120 @@ def post_tweet(tweet_content):
             logger.warning("Tweet was not posted, and no error was raised.")
 
 
+def profile_handler(handler, event, context):
+    """
+    Function to run a handler under cProfile and tracemalloc. The pstats file and
+    the top allocation sites are written to PROFILE_DIR, uploaded to
+    PROFILE_S3_BUCKET if set, and a short summary is logged.
+
+    Parameters:
+    handler (function): The handler to profile.
+    event (dict): The event passed to the handler.
+    context: The Lambda context passed to the handler.
+
+    Returns:
+    The handler's response.
+    """
+    # Imported here so there is no cost when profiling is off
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    run_id = getattr(context, "aws_request_id", None) or datetime.now().strftime(
+        "%Y%m%dT%H%M%S%f"
+    )
+
+    # Files are removed after upload, otherwise they are overwritten by the next run
+    # so they do not fill up /tmp on a warm Lambda
+    file_prefix = "article_publisher"
+    if PROFILE_S3_BUCKET is not None:
+        file_prefix = f"article_publisher_{run_id}"
+    stats_path = os.path.join(PROFILE_DIR, f"{file_prefix}.pstats")
+    allocations_path = os.path.join(PROFILE_DIR, f"{file_prefix}_allocations.txt")
+
+    logger.info(f"Profiling enabled for run {run_id}.")
+    profiler = cProfile.Profile()
+    tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+    profiler.enable()
+    try:
+        return handler(event, context)
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        try:
+            # Write the pstats file and log the hottest functions
+            profiler.dump_stats(stats_path)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats(
+                "cumulative"
+            ).print_stats(PROFILE_TOP_N)
+            logger.info(
+                f"Top {PROFILE_TOP_N} functions by cumulative time:\n{summary.getvalue()}"
+            )
+
+            # Write the full traceback of the top allocation sites to the file and log
+            # the innermost frame in this module, i.e. the pipeline call site
+            top_stats = snapshot.statistics("traceback")[:PROFILE_TOP_N]
+            allocations = []
+            call_sites = []
+            for stat in top_stats:
+                frames = list(stat.traceback)
+                allocations.append(
+                    f"size={stat.size} B, count={stat.count}\n"
+                    + "\n".join(stat.traceback.format(most_recent_first=True))
+                )
+                call_site = next(
+                    (f for f in reversed(frames) if f.filename == __file__), frames[-1]
+                )
+                call_sites.append(
+                    f"{call_site.filename}:{call_site.lineno} "
+                    f"(in {frames[-1].filename}:{frames[-1].lineno}): "
+                    f"size={stat.size} B, count={stat.count}"
+                )
+            with open(allocations_path, "w") as allocations_file:
+                allocations_file.write(
+                    f"Current: {current} bytes, Peak: {peak} bytes\n\n"
+                    + "\n\n".join(allocations)
+                    + "\n"
+                )
+            call_sites = "\n".join(call_sites)
+            logger.info(
+                f"Memory current: {current} bytes, peak: {peak} bytes. "
+                f"Top {PROFILE_TOP_N} allocation sites:\n{call_sites}"
+            )
+            logger.info(f"Wrote profile to {stats_path} and {allocations_path}.")
+
+            # Upload the profile to S3 if a bucket is configured, then remove it
+            if PROFILE_S3_BUCKET is not None:
+                s3_client = get_client("s3")
+                try:
+                    for path in [stats_path, allocations_path]:
+                        key = f"{PROFILE_S3_PREFIX}{os.path.basename(path)}"
+                        s3_client.upload_file(path, PROFILE_S3_BUCKET, key)
+                        logger.info(
+                            f"Uploaded profile to s3://{PROFILE_S3_BUCKET}/{key}."
+                        )
+                finally:
+                    for path in [stats_path, allocations_path]:
+                        os.remove(path)
+        except Exception as e:
+            logger.error(f"An error occurred while saving the profile: {e}")
+
+
 # AWS Lambda handler function
 def lambda_handler(event, context):
+    # Only wrap the run in the profiler when it was asked for
+    if PROFILE_ENABLED or (isinstance(event, dict) and event.get("profile")):
+        return profile_handler(publish, event, context)
+    return publish(event, context)
+
+
+# Run the article publisher pipeline
+def publish(event, context):
     try:
         # Log that the Lambda function has started
         logger.info(f"Lambda function initiated.")
@@ -524,4 +693,339 @@ def lambda_handler(event, context):
     }
 
 
-# lambda_handler(event=None, context=None)
+# Status of the pipeline when running in serve mode
+run_lock = threading.Lock()
+run_status = {
+    "running": False,
+    "last_trigger": None,
+    "last_started": None,
+    "last_finished": None,
+    "last_result": None,
+    "next_scheduled": None,
+}
+
+
+def parse_cron_field(field: str, low: int, high: int):
+    """
+    Function to expand a single cron field into the set of values it matches.
+
+    Parameters:
+    field (str): The cron field, e.g. "*", "*/15", "5/10", "1-5" or "2,4,5".
+    low (int): The lowest value allowed for the field.
+    high (int): The highest value allowed for the field.
+
+    Returns:
+    set: The values matched by the field.
+    """
+    values = set()
+    try:
+        for part in field.split(","):
+            step = None
+            if "/" in part:
+                part, step = part.split("/", 1)
+                step = int(step)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-", 1))
+            else:
+                # A single value with a step runs to the end of the range
+                start = int(part)
+                end = high if step is not None else start
+            if step is None:
+                step = 1
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(field)
+            values.update(range(start, end + 1, step))
+    except ValueError:
+        raise ValueError(f"Invalid cron field: {field}") from None
+    return values
+
+
+def parse_cron(expression: str):
+    """
+    Function to parse a five field cron expression (minute hour day month weekday).
+    Weekdays use 0-6 starting on Sunday, 7 is also accepted for Sunday. As in
+    standard cron, when both day and weekday are restricted either one can match.
+
+    Parameters:
+    expression (str): The cron expression.
+
+    Returns:
+    tuple: The sets of minutes, hours, days, months and weekdays to run on, and
+    whether day and weekday are combined with OR.
+    """
+    fields = expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expression must have 5 fields: {expression}")
+    minutes = parse_cron_field(fields[0], 0, 59)
+    hours = parse_cron_field(fields[1], 0, 23)
+    days = parse_cron_field(fields[2], 1, 31)
+    months = parse_cron_field(fields[3], 1, 12)
+    weekdays = {day % 7 for day in parse_cron_field(fields[4], 0, 7)}
+    day_or_weekday = not fields[2].startswith("*") and not fields[4].startswith("*")
+    return minutes, hours, days, months, weekdays, day_or_weekday
+
+
+def next_cron_time(schedule, after: datetime):
+    """
+    Function to find the next minute after the given time that matches the schedule.
+
+    Parameters:
+    schedule (tuple): A schedule returned by parse_cron.
+    after (datetime): The time to search from.
+
+    Returns:
+    datetime: The next matching time.
+    """
+    minutes, hours, days, months, weekdays, day_or_weekday = schedule
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    end = moment + timedelta(days=366)
+
+    # Search at most a year ahead, skipping whole days and hours that cannot match
+    while moment < end:
+        day_match = moment.day in days
+        weekday_match = (moment.weekday() + 1) % 7 in weekdays
+        if day_or_weekday:
+            date_match = day_match or weekday_match
+        else:
+            date_match = day_match and weekday_match
+
+        if moment.month not in months or not date_match:
+            moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+        elif moment.hour not in hours:
+            moment = moment.replace(minute=0) + timedelta(hours=1)
+        elif moment.minute not in minutes:
+            moment += timedelta(minutes=1)
+        else:
+            return moment
+    raise ValueError("Cron schedule does not match within the next year.")
+
+
+def run_pipeline(trigger: str, lock_acquired: bool = False):
+    """
+    Function to run the article publisher pipeline once in serve mode.
+
+    Parameters:
+    trigger (str): What started the run, e.g. "schedule" or "http".
+    lock_acquired (bool): Whether the caller already holds run_lock.
+
+    Returns:
+    dict: The lambda_handler response.
+    None: If a run was already in progress.
+    """
+    if not lock_acquired and not run_lock.acquire(blocking=False):
+        logger.warning(f"Skipping {trigger} run, a run is already in progress.")
+        return None
+
+    try:
+        run_status["running"] = True
+        run_status["last_trigger"] = trigger
+        run_status["last_started"] = datetime.now(timezone.utc).isoformat()
+        logger.info(f"Starting {trigger} run.")
+        try:
+            result = lambda_handler(
+                event={"source": "article_publisher.serve", "trigger": trigger},
+                context=None,
+            )
+        except Exception as e:
+            logger.error(f"An error occurred during {trigger} run: {e}")
+            result = {"statusCode": 500, "body": f"Internal Server Error: {e}"}
+        run_status["last_result"] = result
+        run_status["last_finished"] = datetime.now(timezone.utc).isoformat()
+        return result
+    finally:
+        run_status["running"] = False
+        run_lock.release()
+
+
+def run_scheduler(schedule, stop_event: threading.Event):
+    """
+    Function to run the pipeline whenever the cron schedule matches, in UTC.
+
+    Parameters:
+    schedule (tuple): A schedule returned by parse_cron.
+    stop_event (threading.Event): Set to stop the scheduler.
+    """
+    while not stop_event.is_set():
+        try:
+            next_run = next_cron_time(schedule, datetime.now(timezone.utc))
+            run_status["next_scheduled"] = next_run.isoformat()
+            logger.info(f"Next scheduled run at {next_run.isoformat()}.")
+
+            # Sleep until the next run, waking up early if the server is stopped
+            while not stop_event.is_set():
+                remaining = (next_run - datetime.now(timezone.utc)).total_seconds()
+                if remaining <= 0:
+                    break
+                stop_event.wait(min(remaining, 60))
+
+            if not stop_event.is_set():
+                run_pipeline(trigger="schedule")
+        except Exception as e:
+            logger.error(f"An error occurred in the scheduler: {e}")
+            run_status["next_scheduled"] = None
+            stop_event.wait(60)
+
+
+class ServeRequestHandler(BaseHTTPRequestHandler):
+    # Shared secret required in the Authorization header to trigger runs
+    token = None
+
+    # Send a JSON response with the given status code
+    def send_json(self, status_code, body):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    # Check the request carries "Authorization: Bearer <token>" if a token is set
+    def is_authorized(self):
+        if self.token is None:
+            return True
+        header = self.headers.get("Authorization", "")
+        return hmac.compare_digest(
+            header.encode("utf-8"), f"Bearer {self.token}".encode("utf-8")
+        )
+
+    # GET /status returns the state of the current and last run
+    def do_GET(self):
+        if self.path == "/status":
+            self.send_json(200, run_status)
+        else:
+            self.send_json(404, {"body": "Not Found"})
+
+    # POST /run starts a run in the background
+    def do_POST(self):
+        if self.path != "/run":
+            self.send_json(404, {"body": "Not Found"})
+        elif not self.is_authorized():
+            self.send_json(401, {"body": "Unauthorized"})
+        elif not run_lock.acquire(blocking=False):
+            self.send_json(409, {"body": "A run is already in progress."})
+        else:
+            # The worker thread takes ownership of the lock and releases it
+            try:
+                threading.Thread(
+                    target=run_pipeline,
+                    kwargs={"trigger": "http", "lock_acquired": True},
+                    daemon=True,
+                ).start()
+            except Exception:
+                run_lock.release()
+                raise
+            self.send_json(202, {"body": "Run started."})
+
+    # Route request logs through the module logger
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+def is_loopback(host: str):
+    """
+    Function to check whether a host only accepts local connections.
+
+    Parameters:
+    host (str): The address to bind to.
+
+    Returns:
+    bool: True if the host is a loopback address.
+    """
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(host: str, port: int, schedule_expression: str, token: str = None):
+    """
+    Function to run the publisher as a long-running service with an in-process
+    scheduler and a local HTTP endpoint to trigger runs and read status.
+
+    Parameters:
+    host (str): The address to bind the HTTP endpoint to.
+    port (int): The port to bind the HTTP endpoint to.
+    schedule_expression (str): A five field cron expression, in UTC.
+    token (str): Shared secret required to trigger runs over HTTP.
+    """
+    # Fail at startup if the schedule is invalid or never matches
+    schedule = parse_cron(schedule_expression)
+    next_cron_time(schedule, datetime.now(timezone.utc))
+
+    if not token and not is_loopback(host):
+        raise ValueError(
+            f"SERVE_TOKEN must be set to serve on non-loopback host {host}."
+        )
+
+    ServeRequestHandler.token = token or None
+    server = ThreadingHTTPServer((host, port), ServeRequestHandler)
+    stop_event = threading.Event()
+
+    # Shut down cleanly on SIGTERM, e.g. from docker stop
+    def handle_sigterm(signum, frame):
+        logger.info("Received SIGTERM.")
+        stop_event.set()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    scheduler = threading.Thread(
+        target=run_scheduler, args=(schedule, stop_event), daemon=True
+    )
+    scheduler.start()
+
+    logger.info(
+        f"Serving on http://{host}:{port} with schedule '{schedule_expression}' (UTC)."
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Shutting down.")
+        stop_event.set()
+        server.server_close()
+
+        # Let an in-progress run finish and stop new ones from starting
+        if run_lock.locked():
+            logger.info("Waiting for the current run to finish.")
+        run_lock.acquire()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m article_publisher")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run the publisher as a long-running local service."
+    )
+    serve_parser.add_argument(
+        "--host", default=os.environ.get("SERVE_HOST", "127.0.0.1")
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=int(os.environ.get("SERVE_PORT", "8080"))
+    )
+    # Same as the EventBridge rule in the CDK stack: 14:00 UTC on Mon, Wed and Thu
+    serve_parser.add_argument(
+        "--schedule", default=os.environ.get("SERVE_SCHEDULE", "0 14 * * 1,3,4")
+    )
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            serve(
+                host=args.host,
+                port=args.port,
+                schedule_expression=args.schedule,
+                token=os.environ.get("SERVE_TOKEN", None),
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
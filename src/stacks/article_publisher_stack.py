@@ -8,6 +8,7 @@ from aws_cdk import (
     aws_events_targets as event_targets,
     aws_iam as iam,
     aws_sns as sns,
+    aws_s3 as s3,
 )
 from constructs import Construct
 
@@ -61,6 +62,16 @@ class ArticlePublisherStack(Stack):
         # Add the policy statement to the Lambda function's execution role
         article_publisher_lambda.role.add_to_policy(statement)
 
+        # Optional bucket for profiles, set with "cdk deploy -c profile_s3_bucket=<name>"
+        profile_s3_bucket = self.node.try_get_context("profile_s3_bucket")
+        if profile_s3_bucket:
+            article_publisher_lambda.add_environment(
+                "PROFILE_S3_BUCKET", profile_s3_bucket
+            )
+            s3.Bucket.from_bucket_name(
+                self, "ArticlePublisherProfileBucket", profile_s3_bucket
+            ).grant_put(article_publisher_lambda, "profiles/*")
+
         # Grant read access to the Lambda function for each SSM parameter
 
         _ = [
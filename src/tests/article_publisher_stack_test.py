@@ -1,5 +1,5 @@
 from aws_cdk import App
-from aws_cdk.assertions import Template
+from aws_cdk.assertions import Match, Template
 
 from stacks.article_publisher_stack import ArticlePublisherStack
 
@@ -10,3 +10,18 @@ def test_article_publisher_stack(snapshot):
 
     template = Template.from_stack(stack)
     assert template.to_json() == snapshot
+
+
+def test_article_publisher_stack_profile_bucket():
+    app = App(context={"profile_s3_bucket": "profile-bucket"})
+    stack = ArticlePublisherStack(scope=app, id="TestArticlePublisherStack")
+
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": Match.object_like({"PROFILE_S3_BUCKET": "profile-bucket"})
+            }
+        },
+    )
@@ -0,0 +1,252 @@
+import importlib.util
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+ARTICLE_PUBLISHER_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "assets"
+    / "lambda"
+    / "article_publisher"
+    / "article_publisher.py"
+)
+
+
+@pytest.fixture
+def article_publisher(monkeypatch):
+    # Mock the SDKs so the lambda module can be imported without them
+    for name in ["boto3", "boto3.session", "openai", "requests", "tweepy"]:
+        monkeypatch.setitem(sys.modules, name, MagicMock())
+
+    spec = importlib.util.spec_from_file_location(
+        "article_publisher", ARTICLE_PUBLISHER_PATH
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def server_url(article_publisher):
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), article_publisher.ServeRequestHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def send_request(url, method="GET", headers=None):
+    request = urllib.request.Request(url, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+@pytest.mark.parametrize(
+    "field, low, high, expected",
+    [
+        ("*", 0, 6, {0, 1, 2, 3, 4, 5, 6}),
+        ("*/15", 0, 59, {0, 15, 30, 45}),
+        ("5/10", 0, 59, {5, 15, 25, 35, 45, 55}),
+        ("1-5", 0, 7, {1, 2, 3, 4, 5}),
+        ("10-20/5", 0, 59, {10, 15, 20}),
+        ("2,4,5", 0, 7, {2, 4, 5}),
+        ("14", 0, 23, {14}),
+    ],
+)
+def test_parse_cron_field(article_publisher, field, low, high, expected):
+    assert article_publisher.parse_cron_field(field, low, high) == expected
+
+
+@pytest.mark.parametrize("field", ["", "a", "2-3-4", "60", "5-1", "*/0", "*/a"])
+def test_parse_cron_field_invalid(article_publisher, field):
+    with pytest.raises(ValueError, match="Invalid cron field"):
+        article_publisher.parse_cron_field(field, 0, 59)
+
+
+def test_parse_cron_field_count(article_publisher):
+    with pytest.raises(ValueError, match="5 fields"):
+        article_publisher.parse_cron("0 14 * *")
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("0 14 * * 1,3,4", datetime(2026, 10, 21, 14, 0, tzinfo=timezone.utc)),
+        ("*/15 * * * *", datetime(2026, 10, 19, 15, 15, tzinfo=timezone.utc)),
+        ("0 0 13 * *", datetime(2026, 11, 13, 0, 0, tzinfo=timezone.utc)),
+        ("0 0 13 * 5", datetime(2026, 10, 23, 0, 0, tzinfo=timezone.utc)),
+        ("0 0 * * 5", datetime(2026, 10, 23, 0, 0, tzinfo=timezone.utc)),
+    ],
+)
+def test_next_cron_time(article_publisher, expression, expected):
+    # 2026-10-19 is a Monday
+    after = datetime(2026, 10, 19, 15, 7, tzinfo=timezone.utc)
+    schedule = article_publisher.parse_cron(expression)
+    assert article_publisher.next_cron_time(schedule, after) == expected
+
+
+@pytest.mark.parametrize("expression", ["0 0 30 2 *", "0 0 29 2 *"])
+def test_next_cron_time_no_match(article_publisher, expression):
+    after = datetime(2026, 10, 19, tzinfo=timezone.utc)
+    schedule = article_publisher.parse_cron(expression)
+    with pytest.raises(ValueError, match="does not match"):
+        article_publisher.next_cron_time(schedule, after)
+
+
+def test_serve_rejects_schedule_that_never_matches(article_publisher):
+    with pytest.raises(ValueError, match="does not match"):
+        article_publisher.serve("127.0.0.1", 0, "0 0 30 2 *")
+
+
+def test_serve_requires_token_on_public_host(article_publisher):
+    with pytest.raises(ValueError, match="SERVE_TOKEN"):
+        article_publisher.serve("0.0.0.0", 0, "0 14 * * 1,3,4")
+
+
+def test_get_client_is_cached(article_publisher):
+    first = article_publisher.get_client("ssm")
+    assert article_publisher.get_client("ssm") is first
+    article_publisher.get_client("sns", region_name="us-east-2")
+    assert article_publisher.boto3.client.call_count == 2
+
+
+def test_get_param_is_cached(article_publisher):
+    ssm_client = article_publisher.boto3.client.return_value
+    ssm_client.get_parameter.return_value = {"Parameter": {"Value": "token"}}
+
+    assert article_publisher.get_param("medium_api_token") == "token"
+    assert article_publisher.get_param("medium_api_token") == "token"
+    ssm_client.get_parameter.assert_called_once_with(
+        Name="medium_api_token", WithDecryption=True
+    )
+
+
+def test_get_param_cache_expires(article_publisher, monkeypatch):
+    monkeypatch.setattr(article_publisher, "PARAM_CACHE_TTL", 0)
+    ssm_client = article_publisher.boto3.client.return_value
+    ssm_client.get_parameter.return_value = {"Parameter": {"Value": "token"}}
+
+    article_publisher.get_param("medium_api_token")
+    article_publisher.get_param("medium_api_token")
+    assert ssm_client.get_parameter.call_count == 2
+
+
+def test_get_param_does_not_cache_errors(article_publisher):
+    ssm_client = article_publisher.boto3.client.return_value
+    ssm_client.get_parameter.side_effect = [
+        Exception("throttled"),
+        {"Parameter": {"Value": "token"}},
+    ]
+
+    assert article_publisher.get_param("medium_api_token") is None
+    assert article_publisher.get_param("medium_api_token") == "token"
+
+
+def test_run_and_status(article_publisher, server_url, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def fake_lambda_handler(event, context):
+        started.set()
+        release.wait(5)
+        return {"statusCode": 200, "body": event["trigger"]}
+
+    monkeypatch.setattr(article_publisher, "lambda_handler", fake_lambda_handler)
+
+    assert send_request(f"{server_url}/run", method="POST")[0] == 202
+    assert started.wait(5)
+    assert send_request(f"{server_url}/run", method="POST")[0] == 409
+    assert send_request(f"{server_url}/status")[1]["running"] is True
+
+    # A scheduled run is skipped while the HTTP run holds the lock
+    assert article_publisher.run_pipeline(trigger="schedule") is None
+
+    release.set()
+    with article_publisher.run_lock:
+        pass
+    status = send_request(f"{server_url}/status")[1]
+    assert status["running"] is False
+    assert status["last_trigger"] == "http"
+    assert status["last_result"] == {"statusCode": 200, "body": "http"}
+
+
+def test_run_requires_token(article_publisher, server_url, monkeypatch):
+    monkeypatch.setattr(article_publisher.ServeRequestHandler, "token", "secret")
+    monkeypatch.setattr(
+        article_publisher, "lambda_handler", lambda event, context: {"statusCode": 200}
+    )
+
+    assert send_request(f"{server_url}/run", method="POST")[0] == 401
+    wrong = {"Authorization": "Bearer wrong"}
+    assert send_request(f"{server_url}/run", method="POST", headers=wrong)[0] == 401
+    right = {"Authorization": "Bearer secret"}
+    assert send_request(f"{server_url}/run", method="POST", headers=right)[0] == 202
+
+
+def test_unknown_path(article_publisher, server_url):
+    assert send_request(f"{server_url}/missing")[0] == 404
+    assert send_request(f"{server_url}/missing", method="POST")[0] == 404
+
+
+def fake_publish(event, context):
+    return {"statusCode": 200, "body": json.dumps([list(range(100))] * 100)}
+
+
+def test_profile_writes_files(article_publisher, monkeypatch, tmp_path):
+    monkeypatch.setattr(article_publisher, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(article_publisher, "publish", fake_publish)
+
+    response = article_publisher.lambda_handler({"profile": True}, None)
+
+    assert response["statusCode"] == 200
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "article_publisher.pstats",
+        "article_publisher_allocations.txt",
+    ]
+    assert "Peak:" in (tmp_path / "article_publisher_allocations.txt").read_text()
+
+
+def test_profile_uploads_and_removes_files(article_publisher, monkeypatch, tmp_path):
+    monkeypatch.setattr(article_publisher, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(article_publisher, "PROFILE_S3_BUCKET", "profile-bucket")
+    monkeypatch.setattr(article_publisher, "publish", fake_publish)
+    context = MagicMock(aws_request_id="request-id")
+
+    article_publisher.lambda_handler({"profile": True}, context)
+
+    s3_client = article_publisher.boto3.client.return_value
+    uploaded_keys = [call.args[2] for call in s3_client.upload_file.call_args_list]
+    assert uploaded_keys == [
+        "profiles/article_publisher_request-id.pstats",
+        "profiles/article_publisher_request-id_allocations.txt",
+    ]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_off_does_not_profile(article_publisher, monkeypatch, tmp_path):
+    cprofile = MagicMock()
+    tracemalloc = MagicMock()
+    monkeypatch.setitem(sys.modules, "cProfile", cprofile)
+    monkeypatch.setitem(sys.modules, "tracemalloc", tracemalloc)
+    monkeypatch.setattr(article_publisher, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(article_publisher, "publish", fake_publish)
+
+    response = article_publisher.lambda_handler({}, None)
+
+    assert response["statusCode"] == 200
+    assert cprofile.mock_calls == []
+    assert tracemalloc.mock_calls == []
+    assert list(tmp_path.iterdir()) == []